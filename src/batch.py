@@ -0,0 +1,126 @@
+"""Request coalescing for Sage."""
+
+import asyncio
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+K = TypeVar("K")
+V = TypeVar("V")
+R = TypeVar("R")
+
+
+class AsyncBatchEngine(Generic[K, V, R]):
+    """Coalesce individual requests into batches for a single processing call.
+
+    A batch is dispatched as soon as ``batch_size`` requests are pending, as
+    soon as their combined weight reaches ``max_weight``, or ``wait_timeout``
+    seconds after the first request of a partial batch arrived. A request
+    that would push a batch over ``max_weight`` starts a new batch; a single
+    request heavier than ``max_weight`` is processed on its own. Batches are
+    processed concurrently.
+    """
+
+    def __init__(
+        self,
+        processing_function: Callable[[List[Tuple[K, V]]], Awaitable[Dict[K, R]]],
+        batch_size: int = 8,
+        wait_timeout: float = 0.3,
+        max_weight: Optional[int] = None,
+        weight_function: Optional[Callable[[V], int]] = None,
+    ):
+        """Initialize the engine.
+
+        Args:
+            processing_function: Coroutine mapping a batch of (key, value) pairs
+                to a dict of results keyed by the same keys
+            batch_size: Maximum number of requests per batch
+            wait_timeout: Seconds to wait for a partial batch to fill up
+            max_weight: Maximum combined weight of a batch (None for no limit)
+            weight_function: Weight of a request value, e.g. len
+        """
+        self.processing_function = processing_function
+        self.batch_size = max(1, batch_size)
+        self.wait_timeout = wait_timeout
+        self.max_weight = max_weight
+        self.weight_function = weight_function
+        self._pending: List[Tuple[K, V, "asyncio.Future[R]"]] = []
+        self._pending_weight = 0
+        self._timer: Optional["asyncio.Task[None]"] = None
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    async def add_request(self, key: K, value: V) -> R:
+        """Queue a request and wait for its result.
+
+        Raises:
+            KeyError: If the processing function returned no result for the key
+            Exception: Any exception raised while processing the batch
+        """
+        future: "asyncio.Future[R]" = asyncio.get_running_loop().create_future()
+        weight = self.weight_function(value) if self.weight_function else 0
+        over_budget = self.max_weight is not None and (
+            self._pending_weight + weight > self.max_weight
+        )
+        if self._pending and over_budget:
+            self._dispatch()
+
+        self._pending.append((key, value, future))
+        self._pending_weight += weight
+
+        if len(self._pending) >= self.batch_size or (
+            self.max_weight is not None and self._pending_weight >= self.max_weight
+        ):
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._dispatch_after_timeout())
+
+        return await future
+
+    async def _dispatch_after_timeout(self) -> None:
+        await asyncio.sleep(self.wait_timeout)
+        self._timer = None
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        self._pending_weight = 0
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._process_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _process_batch(
+        self, batch: List[Tuple[K, V, "asyncio.Future[Any]"]]
+    ) -> None:
+        try:
+            results = await self.processing_function(
+                [(key, value) for key, value, _ in batch]
+            )
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key, _, future in batch:
+            if future.done():
+                continue
+            if key in results:
+                future.set_result(results[key])
+            else:
+                future.set_exception(KeyError(key))
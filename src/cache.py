@@ -0,0 +1,353 @@
+"""Caching of Claude tag suggestions for Sage."""
+
+import asyncio
+import hashlib
+import json
+import math
+import sqlite3
+import threading
+import time
+import urllib.request
+from array import array
+from pathlib import Path
+from typing import Any, List, Optional, Union
+
+try:
+    import sqlite_vec  # type: ignore[import-untyped, import-not-found]
+except ImportError:  # optional dependency
+    sqlite_vec = None
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "sage" / "llm_cache.sqlite"
+DEFAULT_CACHE_TTL = 30 * 24 * 60 * 60  # 30 days
+
+DEFAULT_SEMANTIC_THRESHOLD = 0.92
+DEFAULT_EMBEDDING_MODEL = "nomic-embed-text"
+DEFAULT_OLLAMA_URL = "http://localhost:11434/api/embeddings"
+EMBEDDING_MAX_CHARS = 8192
+
+# Larger contents are hashed in a worker thread (hashlib releases the GIL)
+HASH_IN_THREAD_MIN_BYTES = 64 * 1024
+
+# Without sqlite-vec, only this many of the newest entries are compared
+SEMANTIC_SCAN_LIMIT = 1000
+
+
+def make_prompt_hash(prompt: str, tools: List[str]) -> bytes:
+    """Hash the prompt configuration once, to be combined with content hashes.
+
+    Args:
+        prompt: The prompt sent to Claude
+        tools: Tool restrictions sent with the prompt
+
+    Returns:
+        Raw SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    digest.update(prompt.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(",".join(tools).encode("utf-8"))
+    return digest.digest()
+
+
+def make_cache_key(content: bytes, prompt_hash: bytes) -> str:
+    """Build an exact-match cache key for a document.
+
+    Hashes the raw file bytes directly, so no decoded copy is re-encoded.
+
+    Args:
+        content: The raw file content
+        prompt_hash: Digest from make_prompt_hash
+
+    Returns:
+        Hex encoded SHA-256 digest
+    """
+    content_hash = hashlib.sha256(content).digest()
+    return hashlib.sha256(prompt_hash + content_hash).hexdigest()
+
+
+def _cosine_distance(a: array, b: array) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    if norm == 0:
+        return 1.0
+    return 1.0 - dot / norm
+
+
+class LLMCache:
+    """Exact-match cache mapping document hashes to tag lists.
+
+    Backed by SQLite; blocking calls are run in a worker thread so the
+    event loop is never blocked. Cache failures are treated as misses.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_CACHE_PATH,
+        ttl: Optional[int] = DEFAULT_CACHE_TTL,
+    ):
+        """Initialize the cache.
+
+        Args:
+            path: Location of the SQLite database
+            ttl: Maximum age of an entry in seconds (None disables expiry)
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, tags JSON NOT NULL, created_at INTEGER NOT NULL)"
+            )
+            if self.ttl is not None:
+                conn.execute(
+                    "DELETE FROM cache WHERE created_at < ?",
+                    (int(time.time()) - self.ttl,),
+                )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _get(self, key: str) -> Optional[List[str]]:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute("SELECT tags, created_at FROM cache WHERE key = ?", (key,))
+                .fetchone()
+            )
+            if row is None:
+                return None
+
+            tags, created_at = row
+            if self.ttl is not None and time.time() - created_at > self.ttl:
+                return None
+            return json.loads(tags)
+
+    def _set(self, key: str, tags: List[str]) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, tags, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(tags), int(time.time())),
+            )
+            conn.commit()
+
+    async def get(self, key: str) -> Optional[List[str]]:
+        """Look up cached tags.
+
+        Returns:
+            The cached tag list, or None on a miss or expired entry
+        """
+        try:
+            return await asyncio.to_thread(self._get, key)
+        except (sqlite3.Error, OSError, ValueError):
+            return None
+
+    async def set(self, key: str, tags: List[str]) -> None:
+        """Store tags for a cache key."""
+        try:
+            await asyncio.to_thread(self._set, key, tags)
+        except (sqlite3.Error, OSError):
+            pass
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class SemanticCache:
+    """Similarity cache reusing tags for near-duplicate documents.
+
+    Documents are embedded with a local Ollama model and compared by cosine
+    distance. Uses sqlite-vec when it can be loaded and falls back to a
+    brute-force scan of the newest entries otherwise. Expired entries are
+    deleted when the database is opened. Any failure is treated as a miss, and the
+    embedding service is not retried once it has been found unreachable.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_CACHE_PATH,
+        threshold: float = DEFAULT_SEMANTIC_THRESHOLD,
+        ttl: Optional[int] = DEFAULT_CACHE_TTL,
+        model: str = DEFAULT_EMBEDDING_MODEL,
+        ollama_url: str = DEFAULT_OLLAMA_URL,
+    ):
+        """Initialize the cache.
+
+        Args:
+            path: Location of the SQLite database
+            threshold: Minimum cosine similarity for a cached entry to be reused
+            ttl: Maximum age of an entry in seconds (None disables expiry)
+            model: Ollama embedding model name
+            ollama_url: Ollama embeddings endpoint
+        """
+        self.path = Path(path)
+        self.threshold = threshold
+        self.ttl = ttl
+        self.model = model
+        self.ollama_url = ollama_url
+        self._conn: Optional[sqlite3.Connection] = None
+        self._has_vec = False
+        self._embedder_available = True
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            if sqlite_vec is not None:
+                try:
+                    conn.enable_load_extension(True)
+                    sqlite_vec.load(conn)
+                    conn.enable_load_extension(False)
+                    self._has_vec = True
+                except (AttributeError, sqlite3.Error):
+                    self._has_vec = False
+            # Entries from before rows were keyed cannot be deduplicated
+            columns = [
+                row[1] for row in conn.execute("PRAGMA table_info(semantic_cache)")
+            ]
+            if columns and "key" not in columns:
+                conn.execute("DROP TABLE semantic_cache")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS semantic_cache ("
+                "key TEXT PRIMARY KEY, prompt_key TEXT NOT NULL, "
+                "embedding BLOB NOT NULL, tags JSON NOT NULL, "
+                "created_at INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS semantic_cache_prompt "
+                "ON semantic_cache (prompt_key, created_at)"
+            )
+            if self.ttl is not None:
+                conn.execute(
+                    "DELETE FROM semantic_cache WHERE created_at < ?",
+                    (int(time.time()) - self.ttl,),
+                )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _embed(self, content: str) -> List[float]:
+        payload = json.dumps(
+            {"model": self.model, "prompt": content[:EMBEDDING_MAX_CHARS]}
+        ).encode("utf-8")
+        request = urllib.request.Request(
+            self.ollama_url,
+            data=payload,
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=30) as response:
+            data: Any = json.loads(response.read())
+        return [float(x) for x in data["embedding"]]
+
+    def _get(self, embedding: List[float], prompt_key: str) -> Optional[List[str]]:
+        with self._lock:
+            conn = self._connect()
+            min_created = 0 if self.ttl is None else int(time.time()) - self.ttl
+            max_distance = 1.0 - self.threshold
+            query_vec = array("f", embedding)
+
+            if self._has_vec:
+                row = conn.execute(
+                    "SELECT tags, vec_distance_cosine(embedding, ?) AS distance "
+                    "FROM semantic_cache WHERE prompt_key = ? AND created_at >= ? "
+                    "ORDER BY distance LIMIT 1",
+                    (query_vec.tobytes(), prompt_key, min_created),
+                ).fetchone()
+                if row is None or row[1] is None or row[1] >= max_distance:
+                    return None
+                return json.loads(row[0])
+
+            best_tags = None
+            best_distance = max_distance
+            rows = conn.execute(
+                "SELECT embedding, tags FROM semantic_cache "
+                "WHERE prompt_key = ? AND created_at >= ? "
+                "ORDER BY created_at DESC LIMIT ?",
+                (prompt_key, min_created, SEMANTIC_SCAN_LIMIT),
+            )
+            for blob, tags in rows:
+                stored = array("f")
+                stored.frombytes(blob)
+                if len(stored) != len(query_vec):
+                    continue
+                distance = _cosine_distance(query_vec, stored)
+                if distance < best_distance:
+                    best_distance = distance
+                    best_tags = tags
+            return json.loads(best_tags) if best_tags is not None else None
+
+    def _set(
+        self, key: str, embedding: List[float], prompt_key: str, tags: List[str]
+    ) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO semantic_cache "
+                "(key, prompt_key, embedding, tags, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    key,
+                    prompt_key,
+                    array("f", embedding).tobytes(),
+                    json.dumps(tags),
+                    int(time.time()),
+                ),
+            )
+            conn.commit()
+
+    async def embed(self, content: str) -> Optional[List[float]]:
+        """Embed document content with the local embedding model.
+
+        Returns:
+            The embedding vector, or None if the model is unavailable
+        """
+        if not self._embedder_available:
+            return None
+        try:
+            return await asyncio.to_thread(self._embed, content)
+        except (OSError, ValueError, KeyError, TypeError):
+            self._embedder_available = False
+            return None
+
+    async def get(self, embedding: List[float], prompt_key: str) -> Optional[List[str]]:
+        """Look up tags of the most similar cached document.
+
+        Returns:
+            The cached tag list if similarity exceeds the threshold, else None
+        """
+        try:
+            return await asyncio.to_thread(self._get, embedding, prompt_key)
+        except (sqlite3.Error, OSError, ValueError):
+            return None
+
+    async def set(
+        self, key: str, embedding: List[float], prompt_key: str, tags: List[str]
+    ) -> None:
+        """Store tags for an embedded document.
+
+        Args:
+            key: Exact-match cache key of the document; replaces an older entry
+            embedding: The document embedding
+            prompt_key: Identifies the prompt the tags were suggested for
+            tags: The suggested tags
+        """
+        try:
+            await asyncio.to_thread(self._set, key, embedding, prompt_key, tags)
+        except (sqlite3.Error, OSError):
+            pass
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
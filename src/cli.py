@@ -5,11 +5,17 @@ import json
 import sys
 import time
 from pathlib import Path
-from typing import List
+from typing import Any, Coroutine, Dict, List, Optional
 
 import click
 
+try:
+    import uvloop  # type: ignore[import-not-found]
+except ImportError:  # optional dependency
+    uvloop = None  # type: ignore[assignment]
+
 from . import __version__
+from .cache import DEFAULT_SEMANTIC_THRESHOLD
 from .tagger import AsyncMarkdownTagger
 from .utils import truncate_text
 
@@ -34,6 +40,19 @@ def print_info(message: str) -> None:
     click.echo(click.style(f"ℹ {message}", fg="blue"))
 
 
+def run_async(coro: Coroutine[Any, Any, None]) -> None:
+    """Run a command's coroutine, on uvloop when it is installed."""
+    if uvloop is not None:
+        uvloop.run(coro)
+    else:
+        asyncio.run(coro)
+
+
+def print_json(result: Dict[str, Any]) -> None:
+    """Print result as indented JSON, serializing paths as strings."""
+    click.echo(json.dumps(result, indent=2, default=str))
+
+
 @click.group(invoke_without_command=True)
 @click.option("--version", is_flag=True, help="Show version and exit")
 @click.pass_context
@@ -56,8 +75,27 @@ def main(ctx: click.Context, version: bool) -> None:
 @click.option("--quiet", is_flag=True, help="Minimal output")
 @click.option("--json", "json_output", is_flag=True, help="Output results as JSON")
 @click.option("--timeout", default=120, help="Timeout in seconds for Claude API calls")
+@click.option("--no-cache", is_flag=True, help="Do not reuse tags from earlier runs")
+@click.option(
+    "--no-semantic-cache",
+    is_flag=True,
+    help="Do not reuse tags from similar documents",
+)
+@click.option(
+    "--semantic-threshold",
+    default=DEFAULT_SEMANTIC_THRESHOLD,
+    type=click.FloatRange(0.0, 1.0),
+    help="Minimum similarity for reusing tags from similar documents",
+)
 def file(
-    file_path: Path, force: bool, quiet: bool, json_output: bool, timeout: int
+    file_path: Path,
+    force: bool,
+    quiet: bool,
+    json_output: bool,
+    timeout: int,
+    no_cache: bool,
+    no_semantic_cache: bool,
+    semantic_threshold: float,
 ) -> None:
     """Tag a single markdown file."""
     if not file_path.suffix.lower() == ".md":
@@ -65,17 +103,22 @@ def file(
         sys.exit(1)
 
     async def process():
-        tagger = AsyncMarkdownTagger(timeout=timeout)
+        tagger = AsyncMarkdownTagger(
+            timeout=timeout,
+            use_cache=not no_cache,
+            use_semantic_cache=not no_semantic_cache,
+            semantic_threshold=semantic_threshold,
+        )
         success, error_msg, tags = await tagger.process_file(file_path, force)
 
         if json_output:
             result = {
-                "file": str(file_path),
+                "file": file_path,
                 "success": success,
                 "error": error_msg,
                 "tags": tags,
             }
-            click.echo(json.dumps(result, indent=2))
+            print_json(result)
         elif quiet:
             if not success:
                 sys.exit(1)
@@ -89,7 +132,7 @@ def file(
                 print_error(f"Failed to tag {file_path.name}: {error_msg}")
                 sys.exit(1)
 
-    asyncio.run(process())
+    run_async(process())
 
 
 @main.command()
@@ -103,17 +146,41 @@ def file(
     help="Enable/disable concurrent processing",
 )
 @click.option("--workers", default=5, help="Number of concurrent workers")
+@click.option("--no-batch", is_flag=True, help="Tag each file with its own Claude call")
+@click.option(
+    "--rpm",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Maximum Claude calls per minute (default: 48 per worker)",
+)
 @click.option("--quiet", is_flag=True, help="Minimal output")
 @click.option("--json", "json_output", is_flag=True, help="Output results as JSON")
 @click.option("--timeout", default=120, help="Timeout in seconds for Claude API calls")
+@click.option("--no-cache", is_flag=True, help="Do not reuse tags from earlier runs")
+@click.option(
+    "--no-semantic-cache",
+    is_flag=True,
+    help="Do not reuse tags from similar documents",
+)
+@click.option(
+    "--semantic-threshold",
+    default=DEFAULT_SEMANTIC_THRESHOLD,
+    type=click.FloatRange(0.0, 1.0),
+    help="Minimum similarity for reusing tags from similar documents",
+)
 def files(
     file_paths: List[Path],
     force: bool,
     concurrent: bool,
     workers: int,
+    no_batch: bool,
+    rpm: Optional[float],
     quiet: bool,
     json_output: bool,
     timeout: int,
+    no_cache: bool,
+    no_semantic_cache: bool,
+    semantic_threshold: float,
 ) -> None:
     """Tag multiple markdown files."""
     # Filter to only markdown files
@@ -130,7 +197,15 @@ def files(
 
     async def process():
         max_concurrent = 1 if not concurrent else workers
-        tagger = AsyncMarkdownTagger(max_concurrent=max_concurrent, timeout=timeout)
+        tagger = AsyncMarkdownTagger(
+            max_concurrent=max_concurrent,
+            timeout=timeout,
+            use_cache=not no_cache,
+            use_semantic_cache=not no_semantic_cache,
+            semantic_threshold=semantic_threshold,
+            use_batch=not no_batch,
+            requests_per_minute=rpm,
+        )
 
         start_time = time.time()
         success_count, error_count, errors = await tagger.process_files(
@@ -144,11 +219,9 @@ def files(
                 "success_count": success_count,
                 "error_count": error_count,
                 "elapsed_time": elapsed_time,
-                "errors": [
-                    {"file": str(path), "error": error} for path, error in errors
-                ],
+                "errors": [{"file": path, "error": error} for path, error in errors],
             }
-            click.echo(json.dumps(result, indent=2))
+            print_json(result)
         elif quiet:
             if error_count > 0:
                 sys.exit(1)
@@ -162,7 +235,7 @@ def files(
                     print_error(f"  {file_path.name}: {error}")
                 sys.exit(1)
 
-    asyncio.run(process())
+    run_async(process())
 
 
 @main.command()
@@ -179,24 +252,56 @@ def files(
     help="Enable/disable concurrent processing",
 )
 @click.option("--workers", default=5, help="Number of concurrent workers")
+@click.option("--no-batch", is_flag=True, help="Tag each file with its own Claude call")
+@click.option(
+    "--rpm",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Maximum Claude calls per minute (default: 48 per worker)",
+)
 @click.option("--quiet", is_flag=True, help="Minimal output")
 @click.option("--json", "json_output", is_flag=True, help="Output results as JSON")
 @click.option("--timeout", default=120, help="Timeout in seconds for Claude API calls")
+@click.option("--no-cache", is_flag=True, help="Do not reuse tags from earlier runs")
+@click.option(
+    "--no-semantic-cache",
+    is_flag=True,
+    help="Do not reuse tags from similar documents",
+)
+@click.option(
+    "--semantic-threshold",
+    default=DEFAULT_SEMANTIC_THRESHOLD,
+    type=click.FloatRange(0.0, 1.0),
+    help="Minimum similarity for reusing tags from similar documents",
+)
 def dir(
     directory: Path,
     force: bool,
     recursive: bool,
     concurrent: bool,
     workers: int,
+    no_batch: bool,
+    rpm: Optional[float],
     quiet: bool,
     json_output: bool,
     timeout: int,
+    no_cache: bool,
+    no_semantic_cache: bool,
+    semantic_threshold: float,
 ) -> None:
     """Tag all markdown files in a directory."""
 
     async def process():
         max_concurrent = 1 if not concurrent else workers
-        tagger = AsyncMarkdownTagger(max_concurrent=max_concurrent, timeout=timeout)
+        tagger = AsyncMarkdownTagger(
+            max_concurrent=max_concurrent,
+            timeout=timeout,
+            use_cache=not no_cache,
+            use_semantic_cache=not no_semantic_cache,
+            semantic_threshold=semantic_threshold,
+            use_batch=not no_batch,
+            requests_per_minute=rpm,
+        )
 
         try:
             start_time = time.time()
@@ -209,17 +314,17 @@ def dir(
 
             if json_output:
                 result = {
-                    "directory": str(directory),
+                    "directory": directory,
                     "recursive": recursive,
                     "total_files": total_files,
                     "success_count": success_count,
                     "error_count": error_count,
                     "elapsed_time": elapsed_time,
                     "errors": [
-                        {"file": str(path), "error": error} for path, error in errors
+                        {"file": path, "error": error} for path, error in errors
                     ],
                 }
-                click.echo(json.dumps(result, indent=2))
+                print_json(result)
             elif quiet:
                 if error_count > 0:
                     sys.exit(1)
@@ -247,7 +352,7 @@ def dir(
             print_error(str(e))
             sys.exit(1)
 
-    asyncio.run(process())
+    run_async(process())
 
 
 if __name__ == "__main__":
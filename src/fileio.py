@@ -0,0 +1,89 @@
+"""Asynchronous file I/O helpers for Sage.
+
+Each helper performs the whole open/read-or-write/close sequence in a single
+worker-thread call, instead of one thread-pool round trip per file operation.
+"""
+
+import asyncio
+import mmap
+import os
+from pathlib import Path
+from typing import Tuple, Union
+
+# Appending cannot overwrite edits to the body, so before appending only the
+# size and this many trailing bytes are compared with the expected content
+_APPEND_CHECK_BYTES = 4096
+
+
+def _read_tail(path: Path, size: int) -> Tuple[bytes, bool]:
+    with open(path, "rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        offset = max(0, file_size - size)
+        f.seek(offset)
+        return f.read(), offset == 0
+
+
+def _replace_if_unchanged(path: Path, expected: bytes, data: bytes) -> bool:
+    with open(path, "r+b") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size != len(expected):
+            return False
+        if size:
+            # Compare against the mapped file without copying it into memory
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    if view != expected:
+                        return False
+        f.seek(0)
+        f.write(data)
+        f.truncate()
+    return True
+
+
+def _append_if_unchanged(path: Path, expected: bytes, data: bytes) -> bool:
+    with open(path, "r+b") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size != len(expected):
+            return False
+        check = min(size, _APPEND_CHECK_BYTES)
+        f.seek(size - check)
+        if f.read(check) != memoryview(expected)[size - check :]:
+            return False
+        f.write(data)
+    return True
+
+
+async def read_bytes(path: Union[str, Path]) -> bytes:
+    """Read the full content of a file."""
+    return await asyncio.to_thread(Path(path).read_bytes)
+
+
+async def read_tail(path: Union[str, Path], size: int) -> Tuple[bytes, bool]:
+    """Read at most the last size bytes of a file.
+
+    Returns:
+        Tuple of (data, is_whole_file)
+    """
+    return await asyncio.to_thread(_read_tail, Path(path), size)
+
+
+async def replace_if_unchanged(
+    path: Union[str, Path], expected: bytes, data: bytes
+) -> bool:
+    """Replace the content of a file only if it still equals expected.
+
+    Returns:
+        True if the file was written, False if it changed since it was read
+    """
+    return await asyncio.to_thread(_replace_if_unchanged, Path(path), expected, data)
+
+
+async def append_if_unchanged(
+    path: Union[str, Path], expected: bytes, data: bytes
+) -> bool:
+    """Append to a file only if it still has the size and ending of expected.
+
+    Returns:
+        True if the data was appended, False if the file changed since it was read
+    """
+    return await asyncio.to_thread(_append_if_unchanged, Path(path), expected, data)
@@ -0,0 +1,49 @@
+"""Request rate limiting for Sage."""
+
+import asyncio
+import time
+from typing import Any
+
+
+class RateLimiter:
+    """Token bucket limiting how often Claude calls may start.
+
+    Usable as an async context manager: entering waits for a token.
+    Complements the concurrency semaphore, which only bounds how many
+    calls run at once, not how quickly they are started.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """Initialize the limiter.
+
+        Args:
+            rate: Sustained number of requests allowed per second
+            burst: Number of requests that may start back to back
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a request may start."""
+        while True:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def __aenter__(self) -> "RateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        return None
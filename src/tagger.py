@@ -1,33 +1,141 @@
 """Core tagging functionality for Sage."""
 
 import asyncio
-import re
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Tuple, Union
-import aiofiles
-
-from claude_code_sdk import query, ClaudeCodeOptions
-from .utils import validate_tags, verify_content_unchanged
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from claude_code_sdk import (
+    AssistantMessage,
+    ClaudeCodeOptions,
+    ResultMessage,
+    TextBlock,
+    query,
+)
+from .batch import AsyncBatchEngine
+from .cache import (
+    DEFAULT_SEMANTIC_THRESHOLD,
+    LLMCache,
+    SemanticCache,
+    HASH_IN_THREAD_MIN_BYTES,
+    make_cache_key,
+    make_prompt_hash,
+)
+from .fileio import (
+    append_if_unchanged,
+    read_bytes,
+    read_tail,
+    replace_if_unchanged,
+)
+from .limiter import RateLimiter
+from .worker import ClaudeWorkerPool
+from .utils import (
+    is_valid_tag,
+    parse_tag_lines,
+    parse_tag_response,
+    split_tag_block,
+)
+
+# Tags live at the end of a file, so the already-tagged check reads only this much
+_TAIL_BYTES = 4096
+# Attempts per file and the cap on the backoff between them, in seconds
+_MAX_ATTEMPTS = 3
+_MAX_BACKOFF = 30
+# Prompts answered by one Claude session before it is restarted, and the
+# combined document characters per batched call; together they keep a
+# session's history (about 120k characters) well inside the context window.
+# A larger document is sent on its own.
+_SESSION_MAX_REQUESTS = 4
+_BATCH_MAX_CHARS = 30_000
+# Claude only has to answer with text; an empty allowed_tools list does not
+# restrict anything, so every built-in tool is disallowed explicitly
+_DISALLOWED_TOOLS = [
+    "Bash",
+    "BashOutput",
+    "Edit",
+    "ExitPlanMode",
+    "Glob",
+    "Grep",
+    "KillShell",
+    "LS",
+    "MultiEdit",
+    "NotebookEdit",
+    "NotebookRead",
+    "Read",
+    "SlashCommand",
+    "Task",
+    "TodoWrite",
+    "WebFetch",
+    "WebSearch",
+    "Write",
+]
+
+
+def _scan_directory(directory: Path) -> Tuple[List[Path], List[Path]]:
+    """List markdown files and subdirectories of a single directory.
+
+    Uses the file type cached by os.scandir, so no extra stat call is made
+    for regular entries. Unreadable directories are skipped.
+
+    Returns:
+        Tuple of (markdown_files, subdirectories)
+    """
+    files = []
+    subdirectories = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(Path(entry.path))
+                elif entry.name.endswith(".md") and entry.is_file():
+                    files.append(Path(entry.path))
+    except OSError:
+        pass
+    return files, subdirectories
 
 
 class AsyncMarkdownTagger:
     """Asynchronous markdown tagger using Claude Code SDK."""
 
-    def __init__(self, max_concurrent: int = 5, timeout: int = 120):
+    def __init__(
+        self,
+        max_concurrent: int = 5,
+        timeout: int = 120,
+        use_cache: bool = True,
+        cache_path: Optional[Path] = None,
+        use_semantic_cache: bool = True,
+        semantic_threshold: float = DEFAULT_SEMANTIC_THRESHOLD,
+        use_batch: bool = True,
+        batch_size: int = 8,
+        requests_per_minute: Optional[float] = None,
+    ):
         """Initialize the tagger.
 
         Args:
             max_concurrent: Maximum number of concurrent processing tasks
             timeout: Timeout in seconds for Claude API calls (maintained for API compatibility)
+            use_cache: Reuse tags from earlier runs on identical content
+            cache_path: Location of the cache database (defaults to ~/.cache/sage)
+            use_semantic_cache: Reuse tags from similar documents (requires Ollama)
+            semantic_threshold: Minimum cosine similarity for semantic cache hits
+            use_batch: Tag several files per Claude call in process_files
+            batch_size: Maximum number of files per Claude call
+            requests_per_minute: Maximum rate of Claude calls (defaults to
+                0.8 calls per second per concurrent worker)
         """
         self.max_concurrent = max_concurrent
         self.timeout = (
             timeout  # Kept for compatibility, but SDK handles timeouts internally
         )
+        self.use_batch = use_batch
+        self.batch_size = batch_size
 
-        self.claude_prompt = """Analyze this markdown document and suggest 2-5 relevant one word tags that describe the topic, technology, or type of content.
+        rate = requests_per_minute / 60 if requests_per_minute else max_concurrent * 0.8
+        self.limiter = RateLimiter(rate)
 
-Requirements:
+        tag_requirements = """Requirements:
 - Tags must be single words only (no spaces)
 - Tags must be lowercase
 - Tags should be relevant and descriptive
@@ -35,44 +143,151 @@ Requirements:
 - Examples: 
   - English: python, debugging, react, tutorial, planning
   - Norwegian: programmering, feilsøking, veiledning, planlegging
-  - German: programmierung, fehlersuche, anleitung, planung
+  - German: programmierung, fehlersuche, anleitung, planung"""
+
+        self.claude_prompt = f"""Analyze this markdown document and suggest 2-5 relevant one word tags that describe the topic, technology, or type of content.
+
+{tag_requirements}
+
+Return only the tags, one per line, without any other text. The document follows."""
 
-Open the markdown file and at the end of the file add these tags. Each tag should be on a new line surrounded by [[]] like [[tag]]. Do not remove the existing [[claude]] tag if it exists."""
+        self.batch_prompt = f"""Analyze each of the markdown documents below and suggest 2-5 relevant one word tags per document that describe the topic, technology, or type of content.
+
+{tag_requirements}
+
+Each document starts with a line <<<FILE path>>> and ends with a line <<<END>>>. Respond with only a JSON object mapping each document path to its list of tags, like {{"notes/a.md": ["python", "tutorial"]}}."""
 
         self.claude_options = ClaudeCodeOptions(
-            max_turns=3,
-            system_prompt="You are a helpful assistant that analyzes markdown content and adds semantic tags.",
-            allowed_tools=["Read", "Edit"],
-            permission_mode="acceptEdits",
+            max_turns=1,
+            system_prompt="You are a helpful assistant that analyzes markdown content and suggests semantic tags. Each message is independent: base your answer only on the documents in that message.",
+            disallowed_tools=_DISALLOWED_TOOLS,
+        )
+
+        self.cache: Optional[LLMCache] = None
+        self.semantic_cache: Optional[SemanticCache] = None
+        if use_cache:
+            self.cache = LLMCache(cache_path) if cache_path else LLMCache()
+            if use_semantic_cache:
+                self.semantic_cache = (
+                    SemanticCache(cache_path, threshold=semantic_threshold)
+                    if cache_path
+                    else SemanticCache(threshold=semantic_threshold)
+                )
+        self._prompt_hash = make_prompt_hash(
+            self.claude_prompt, self.claude_options.disallowed_tools
         )
+        self._prompt_key = self._prompt_hash.hex()
+        self._pool: Optional[ClaudeWorkerPool] = None
+
+    async def _lookup_cache(
+        self, raw_content: bytes, content: str
+    ) -> Tuple[Optional[List[str]], Optional[str], Optional[List[float]]]:
+        """Look up tags for content in the exact-match and semantic caches.
 
-    async def check_already_tagged(self, file_path: Path) -> Tuple[bool, List[str]]:
-        """Check if file already has tags (excluding [[claude]]).
+        Args:
+            raw_content: The file content as read from disk, used for the key
+            content: The decoded content, used for embedding
 
         Returns:
-            Tuple of (has_tags, list_of_non_claude_tags)
+            Tuple of (cached_tags, cache_key, embedding); cache_key and
+            embedding are passed on to _store_cache after a miss
         """
-        async with aiofiles.open(file_path, "r", encoding="utf-8") as f:
-            content = await f.read()
+        cache_key = None
+        if self.cache is not None:
+            if len(raw_content) >= HASH_IN_THREAD_MIN_BYTES:
+                cache_key = await asyncio.to_thread(
+                    make_cache_key, raw_content, self._prompt_hash
+                )
+            else:
+                cache_key = make_cache_key(raw_content, self._prompt_hash)
+            cached_tags = await self.cache.get(cache_key)
+            if cached_tags:
+                return cached_tags, cache_key, None
+
+        embedding = None
+        if self.semantic_cache is not None:
+            embedding = await self.semantic_cache.embed(content)
+            if embedding is not None:
+                similar_tags = await self.semantic_cache.get(
+                    embedding, self._prompt_key
+                )
+                if similar_tags:
+                    if self.cache is not None and cache_key is not None:
+                        await self.cache.set(cache_key, similar_tags)
+                    return similar_tags, cache_key, embedding
+
+        return None, cache_key, embedding
+
+    async def _store_cache(
+        self,
+        cache_key: Optional[str],
+        embedding: Optional[List[float]],
+        tags: List[str],
+    ) -> None:
+        """Remember Claude's valid suggestions for content after a cache miss."""
+        if not tags:
+            return
+        if self.cache is not None and cache_key is not None:
+            await self.cache.set(cache_key, tags)
+        if (
+            self.semantic_cache is not None
+            and cache_key is not None
+            and embedding is not None
+        ):
+            await self.semantic_cache.set(cache_key, embedding, self._prompt_key, tags)
+
+    def _already_tagged(self, content: str) -> Tuple[bool, List[str]]:
+        """Check if content already ends in a tag block (excluding [[claude]]).
+
+        Wikilinks in the body do not count, only the trailing [[tag]] lines.
 
-        # Find all tags
-        tag_pattern = r"\[\[([^\]]+)\]\]"
-        tags = re.findall(tag_pattern, content)
+        Returns:
+            Tuple of (has_tags, list_of_non_claude_tags)
+        """
+        _, tags = split_tag_block(content)
 
         # Filter out 'claude' tag
-        non_claude_tags = [tag for tag in tags if tag != "claude"]
+        non_claude_tags = [tag for tag in dict.fromkeys(tags) if tag != "claude"]
 
         return len(non_claude_tags) > 0, non_claude_tags
 
+    async def _read_once(self, file_path: Path) -> bytes:
+        """Read the raw file content in a single pass."""
+        return await read_bytes(file_path)
+
+    async def _read_untagged(
+        self, file_path: Path, force: bool
+    ) -> Tuple[Optional[bytes], List[str]]:
+        """Read a file for tagging unless it is already tagged.
+
+        Only the end of the file is read to look for existing tags; the full
+        content is read only when the file is going to be tagged.
+
+        Returns:
+            Tuple of (raw_content, existing_tags); raw_content is None when the
+            file is already tagged and force is not set
+        """
+        tail, is_whole_file = await read_tail(file_path, _TAIL_BYTES)
+        already_tagged, existing_tags = self._already_tagged(
+            tail.decode("utf-8", errors="ignore")
+        )
+        if already_tagged and not force:
+            return None, existing_tags
+
+        raw_content = tail if is_whole_file else await self._read_once(file_path)
+        return raw_content, existing_tags
+
     async def process_file(
-        self, file_path: Union[str, Path], force: bool = False, retry_count: int = 0
+        self, file_path: Union[str, Path], force: bool = False
     ) -> Tuple[bool, Optional[str], List[str]]:
         """Process a single markdown file.
 
+        Failed attempts are retried with exponential backoff; the
+        already-tagged check only runs before the first attempt.
+
         Args:
             file_path: Path to the markdown file
             force: Force retagging even if already tagged
-            retry_count: Current retry attempt
 
         Returns:
             Tuple of (success, error_message, tags_added)
@@ -80,84 +295,257 @@ Open the markdown file and at the end of the file add these tags. Each tag shoul
         file_path = Path(file_path)
 
         # Check if already tagged
-        already_tagged, existing_tags = await self.check_already_tagged(file_path)
-        if already_tagged and not force:
+        try:
+            raw_content, existing_tags = await self._read_untagged(file_path, force)
+        except Exception as e:
+            return False, f"Error: {e}", []
+        if raw_content is None:
             return True, None, existing_tags
 
-        try:
-            # Store original content for verification
-            async with aiofiles.open(file_path, "r", encoding="utf-8") as f:
-                original_content = await f.read()
-
-            # Configure SDK options with current working directory set to file's parent
-            options = ClaudeCodeOptions(
-                max_turns=self.claude_options.max_turns,
-                system_prompt=self.claude_options.system_prompt,
-                cwd=file_path.parent,
-                allowed_tools=self.claude_options.allowed_tools,
-                permission_mode=self.claude_options.permission_mode,
+        return await self._tag_with_retries(file_path, raw_content)
+
+    async def _tag_with_retries(
+        self, file_path: Path, raw_content: bytes, first_attempt: int = 0
+    ) -> Tuple[bool, Optional[str], List[str]]:
+        """Tag a file one call at a time, retrying with exponential backoff.
+
+        Args:
+            file_path: Path to the markdown file
+            raw_content: The file content as read for the first attempt
+            first_attempt: Number of attempts already made elsewhere
+
+        Returns:
+            Tuple of (success, error_message, tags_added)
+        """
+        error: Optional[Exception] = None
+        for attempt in range(first_attempt, _MAX_ATTEMPTS):
+            try:
+                if attempt > 0:
+                    # Exponential backoff with jitter before retrying
+                    backoff = 2 ** (attempt - 1) + random.random()
+                    await asyncio.sleep(min(backoff, _MAX_BACKOFF))
+                    # The file may have been edited while the last attempt ran
+                    raw_content = await self._read_once(file_path)
+                return await self._tag_content(file_path, raw_content)
+            except Exception as e:
+                error = e
+
+        return False, f"Error after {_MAX_ATTEMPTS} attempts: {error}", []
+
+    async def _tag_content(
+        self, file_path: Path, raw_content: bytes
+    ) -> Tuple[bool, Optional[str], List[str]]:
+        """Suggest tags for the content of a file and write them.
+
+        Returns:
+            Tuple of (success, error_message, tags_added)
+        """
+        original_content = raw_content.decode("utf-8")
+
+        # Reuse tags from an earlier run or a near-duplicate document
+        cached_tags, cache_key, embedding = await self._lookup_cache(
+            raw_content, original_content
+        )
+        if cached_tags:
+            tags = await self._write_tags(
+                file_path, raw_content, original_content, cached_tags
             )
+            return True, None, tags
 
-            # Use Claude Code SDK to process the file
-            prompt = f"{self.claude_prompt}\n\nProcess the file: {file_path.name}"
+        prompt = f"{self.claude_prompt}\n\n{original_content}"
+
+        messages = await self._ask_claude(prompt)
+
+        # Check if processing was successful (SDK doesn't return error codes like subprocess)
+        if not messages:
+            return False, "No response from Claude SDK", []
+
+        suggested = parse_tag_lines(self._response_text(messages))
+        return await self._apply_tags(
+            file_path,
+            raw_content,
+            original_content,
+            suggested,
+            cache_key,
+            embedding,
+        )
+
+    async def _ask_claude(self, prompt: str) -> List[Any]:
+        """Send a prompt to Claude and collect all response messages.
+
+        Uses the persistent worker pool while process_files is running, and a
+        one-off Claude process otherwise.
+        """
+        async with self.limiter:
+            if self._pool is not None:
+                return await self._pool.ask(prompt)
 
-            # Collect all messages from the SDK
             messages = []
-            async for message in query(prompt=prompt, options=options):
+            async for message in query(prompt=prompt, options=self.claude_options):
                 messages.append(message)
+            return messages
+
+    @staticmethod
+    def _response_text(messages: List[Any]) -> str:
+        """Extract Claude's final text answer from SDK messages."""
+        for message in reversed(messages):
+            if isinstance(message, ResultMessage) and message.result:
+                return message.result
+
+        return "".join(
+            block.text
+            for message in messages
+            if isinstance(message, AssistantMessage)
+            for block in message.content
+            if isinstance(block, TextBlock)
+        )
+
+    async def _suggest_tags_batch(
+        self, batch: List[Tuple[Path, str]]
+    ) -> Dict[Path, List[str]]:
+        """Ask Claude for tags for several documents in a single call.
 
-            # Check if processing was successful (SDK doesn't return error codes like subprocess)
-            if not messages:
-                return False, "No response from Claude SDK", []
+        Args:
+            batch: List of (file_path, content) pairs
 
-            # Read updated content and verify integrity
-            async with aiofiles.open(file_path, "r", encoding="utf-8") as f:
-                updated_content = await f.read()
+        Returns:
+            Dict mapping each file path to its suggested tags
+        """
+        documents = "\n\n".join(
+            f"<<<FILE {file_path}>>>\n{content}\n<<<END>>>"
+            for file_path, content in batch
+        )
+        prompt = f"{self.batch_prompt}\n\n{documents}"
 
-            # Verify original content wasn't altered
-            if not verify_content_unchanged(original_content, updated_content):
-                # Restore original content
-                async with aiofiles.open(file_path, "w", encoding="utf-8") as f:
-                    await f.write(original_content)
-                return False, "Content verification failed - restored original", []
+        messages = await self._ask_claude(prompt)
 
-            # Validate tags in the updated file
-            valid_tags, invalid_tags = validate_tags(updated_content)
+        if not messages:
+            raise RuntimeError("No response from Claude SDK")
 
-            if invalid_tags:
-                # Clean up file by removing invalid tags
-                await self._cleanup_invalid_tags(file_path, valid_tags)
-                return True, f"Cleaned {len(invalid_tags)} invalid tags", valid_tags
+        suggestions = parse_tag_response(self._response_text(messages))
+        return {
+            file_path: suggestions[str(file_path)]
+            for file_path, _ in batch
+            if str(file_path) in suggestions
+        }
 
-            return True, None, valid_tags
+    async def _process_file_batched(
+        self,
+        file_path: Path,
+        force: bool,
+        engine: AsyncBatchEngine[Path, str, List[str]],
+    ) -> Tuple[bool, Optional[str], List[str]]:
+        """Process a single markdown file through a batch engine.
+
+        If the batch fails, for instance because Claude's answer cannot be
+        parsed or lacks the file, the file falls back to single-file calls
+        for its remaining attempts.
 
+        Returns:
+            Tuple of (success, error_message, tags_added)
+        """
+        try:
+            raw_content, existing_tags = await self._read_untagged(file_path, force)
         except Exception as e:
-            if retry_count < 2:  # Retry up to 2 times for any errors
-                await asyncio.sleep(2)  # Wait before retry
-                return await self.process_file(file_path, force, retry_count + 1)
+            return False, f"Error: {e}", []
+        if raw_content is None:
+            return True, None, existing_tags
+
+        try:
+            original_content = raw_content.decode("utf-8")
+
+            cached_tags, cache_key, embedding = await self._lookup_cache(
+                raw_content, original_content
+            )
+            if cached_tags:
+                tags = await self._write_tags(
+                    file_path, raw_content, original_content, cached_tags
+                )
+                return True, None, tags
+
+            suggested = await engine.add_request(file_path, original_content)
+            return await self._apply_tags(
+                file_path,
+                raw_content,
+                original_content,
+                suggested,
+                cache_key,
+                embedding,
+            )
+        except Exception:
+            return await self._tag_with_retries(file_path, raw_content, first_attempt=1)
+
+    async def _apply_tags(
+        self,
+        file_path: Path,
+        raw_content: bytes,
+        content: str,
+        suggested: List[str],
+        cache_key: Optional[str],
+        embedding: Optional[List[float]],
+    ) -> Tuple[bool, Optional[str], List[str]]:
+        """Validate Claude's suggestions, write the valid ones and cache them.
+
+        Returns:
+            Tuple of (success, error_message, tags_added)
+        """
+        valid_tags: List[str] = []
+        invalid_tags: List[str] = []
+        for tag in dict.fromkeys(suggested):
+            if is_valid_tag(tag):
+                valid_tags.append(tag)
             else:
-                return False, f"Error after {retry_count + 1} attempts: {e}", []
+                invalid_tags.append(tag)
 
-    async def _cleanup_invalid_tags(
-        self, file_path: Path, valid_tags: List[str]
-    ) -> None:
-        """Remove invalid tags and keep only valid ones."""
-        async with aiofiles.open(file_path, "r", encoding="utf-8") as f:
-            content = await f.read()
-
-        # Remove all existing tags
-        tag_pattern = r"\[\[([^\]]+)\]\]\s*\n?"
-        content_no_tags = re.sub(tag_pattern, "", content).rstrip()
-
-        # Add back only valid tags
-        if valid_tags:
-            tag_lines = [f"[[{tag}]]" for tag in valid_tags]
-            content_with_valid_tags = content_no_tags + "\n\n" + "\n".join(tag_lines)
-        else:
-            content_with_valid_tags = content_no_tags
+        await self._store_cache(cache_key, embedding, valid_tags)
+        tags = await self._write_tags(file_path, raw_content, content, valid_tags)
+
+        if invalid_tags:
+            return True, f"Cleaned {len(invalid_tags)} invalid tags", tags
+        return True, None, tags
+
+    async def _write_tags(
+        self, file_path: Path, raw_content: bytes, content: str, new_tags: List[str]
+    ) -> List[str]:
+        """Write the file with new tags added to its trailing tag block.
 
-        async with aiofiles.open(file_path, "w", encoding="utf-8") as f:
-            await f.write(content_with_valid_tags)
+        Existing tags in the block are kept. When the file already ends in a
+        prefix of the new tag block, only the missing tag lines are appended;
+        otherwise the file is rewritten with the body unchanged.
+
+        Args:
+            file_path: Path to the markdown file
+            raw_content: The file content as read, to detect concurrent edits
+            content: The decoded file content
+            new_tags: Tags to add
+
+        Returns:
+            The tags in the resulting tag block
+
+        Raises:
+            RuntimeError: If the file was modified since it was read
+        """
+        body, existing_tags = split_tag_block(content)
+        tags = list(dict.fromkeys(existing_tags + new_tags))
+        if tags == existing_tags:
+            return tags
+
+        tag_lines = "\n".join(f"[[{tag}]]" for tag in tags)
+        tag_block = f"\n\n{tag_lines}" if body else tag_lines
+        current_block = content[len(body) :]
+        if tag_block.startswith(current_block):
+            written = await append_if_unchanged(
+                file_path,
+                raw_content,
+                tag_block[len(current_block) :].encode("utf-8"),
+            )
+        else:
+            written = await replace_if_unchanged(
+                file_path, raw_content, f"{body}{tag_block}".encode("utf-8")
+            )
+        if not written:
+            raise RuntimeError("File was modified while tagging")
+        return tags
 
     async def process_files(
         self, file_paths: List[Union[str, Path]], force: bool = False
@@ -168,24 +556,84 @@ Open the markdown file and at the end of the file add these tags. Each tag shoul
             file_paths: List of file paths to process
             force: Force retagging even if already tagged
 
+        Returns:
+            Tuple of (success_count, error_count, errors_list)
+        """
+
+        async def iter_paths() -> AsyncIterator[Path]:
+            for file_path in file_paths:
+                yield Path(file_path)
+
+        return await self._process_paths(iter_paths(), force)
+
+    async def _process_paths(
+        self, file_paths: AsyncIterator[Path], force: bool
+    ) -> Tuple[int, int, List[Tuple[Union[str, Path], str]]]:
+        """Process files as they are produced by an async iterator.
+
+        Processing of each file starts as soon as its path arrives, so tagging
+        overlaps with directory enumeration.
+
         Returns:
             Tuple of (success_count, error_count, errors_list)
         """
         semaphore = asyncio.Semaphore(self.max_concurrent)
 
-        async def process_with_semaphore(file_path):
-            async with semaphore:
-                return await self.process_file(file_path, force)
+        if self.use_batch:
 
-        file_paths = [Path(p) for p in file_paths]
-        tasks = [process_with_semaphore(file_path) for file_path in file_paths]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+            async def suggest_with_semaphore(batch):
+                async with semaphore:
+                    return await self._suggest_tags_batch(batch)
+
+            engine: AsyncBatchEngine[Path, str, List[str]] = AsyncBatchEngine(
+                suggest_with_semaphore,
+                batch_size=self.batch_size,
+                max_weight=_BATCH_MAX_CHARS,
+                weight_function=len,
+            )
+            # Keep enough files in flight to fill every concurrent batch
+            in_flight = asyncio.Semaphore(self.max_concurrent * self.batch_size)
+
+            async def process_with_semaphore(file_path):
+                async with in_flight:
+                    return await self._process_file_batched(file_path, force, engine)
+
+        else:
+
+            async def process_with_semaphore(file_path):
+                async with semaphore:
+                    return await self.process_file(file_path, force)
+
+        # Reuse one Claude process per worker for the whole run
+        owns_pool = self._pool is None
+        if owns_pool:
+            self._pool = ClaudeWorkerPool(
+                self.claude_options,
+                self.max_concurrent,
+                max_requests=_SESSION_MAX_REQUESTS,
+            )
+
+        paths: List[Path] = []
+        tasks = []
+        try:
+            async for file_path in file_paths:
+                paths.append(file_path)
+                tasks.append(asyncio.create_task(process_with_semaphore(file_path)))
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            if owns_pool and self._pool is not None:
+                pool, self._pool = self._pool, None
+                await pool.close()
 
         success_count = 0
         error_count = 0
-        errors = []
+        errors: List[Tuple[Union[str, Path], str]] = []
 
-        for file_path, result in zip(file_paths, results):
+        for file_path, result in zip(paths, results):
             if isinstance(result, Exception):
                 error_count += 1
                 errors.append((file_path, str(result)))
@@ -223,13 +671,34 @@ Open the markdown file and at the end of the file add these tags. Each tag shoul
         if not directory.is_dir():
             raise NotADirectoryError(f"Path is not a directory: {directory}")
 
-        # Find all markdown files
-        pattern = "**/*.md" if recursive else "*.md"
-        markdown_files = list(directory.glob(pattern))
+        return await self._process_paths(
+            self._iter_markdown(directory, recursive), force
+        )
 
-        if not markdown_files:
-            return 0, 0, []
+    async def _iter_markdown(
+        self, directory: Path, recursive: bool
+    ) -> AsyncIterator[Path]:
+        """Yield markdown files in a directory as they are found.
 
-        # Convert Path objects to Union[str, Path] for type compatibility
-        file_paths: List[Union[str, Path]] = list(markdown_files)
-        return await self.process_files(file_paths, force)
+        Directories are scanned with os.scandir in a thread pool, several at
+        a time, so enumeration neither blocks the event loop nor waits for
+        the whole tree before the first file is yielded.
+        """
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            pending = {loop.run_in_executor(executor, _scan_directory, directory)}
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    files, subdirectories = future.result()
+                    for file_path in files:
+                        yield file_path
+                    if recursive:
+                        for subdirectory in subdirectories:
+                            pending.add(
+                                loop.run_in_executor(
+                                    executor, _scan_directory, subdirectory
+                                )
+                            )
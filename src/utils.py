@@ -1,7 +1,33 @@
 """Utility functions for Sage."""
 
+import json
 import re
-from typing import List, Tuple
+from typing import Dict, List, Tuple
+
+_TAG_RE = re.compile(r"\[\[([^\]]+)\]\]")
+# Deletes every character allowed in a tag; anything left over makes it invalid
+_STRIP_VALID_CHARS = str.maketrans("", "", "abcdefghijklmnopqrstuvwxyz0123456789-")
+
+
+def extract_tags(text: str) -> List[str]:
+    """Extract the names of all [[tag]] occurrences in text.
+
+    Args:
+        text: The text to scan
+
+    Returns:
+        List of tag names in order of appearance
+    """
+    return _TAG_RE.findall(text)
+
+
+def is_valid_tag(tag: str) -> bool:
+    """Check that a tag uses only lowercase letters, numbers and hyphens.
+
+    The claude tag is always valid; spaces, uppercase and shell characters
+    are rejected.
+    """
+    return tag == "claude" or not tag.translate(_STRIP_VALID_CHARS)
 
 
 def validate_tags(text: str) -> Tuple[List[str], List[str]]:
@@ -14,9 +40,9 @@ def validate_tags(text: str) -> Tuple[List[str], List[str]]:
     Returns:
         Tuple of (valid_tags, invalid_tags)
     """
-    # Only look for tags in the last 20 lines to avoid code blocks
-    lines = text.split("\n")
-    last_lines = lines[-20:] if len(lines) > 20 else lines
+    # Only look for tags in the last 20 lines to avoid code blocks; rsplit
+    # stops after 20 splits instead of splitting the whole document
+    last_lines = text.rsplit("\n", 20)[-20:]
 
     # Remove code blocks from the search area
     filtered_lines = []
@@ -30,62 +56,101 @@ def validate_tags(text: str) -> Tuple[List[str], List[str]]:
             filtered_lines.append(line)
 
     search_text = "\n".join(filtered_lines)
-    tag_pattern = r"\[\[([^\]]+)\]\]"
-    tags = re.findall(tag_pattern, search_text)
-
-    valid_tags = []
-    invalid_tags = []
+    # Deduplicate while keeping the order tags appear in
+    tags = list(dict.fromkeys(extract_tags(search_text)))
 
+    valid_tags: List[str] = []
+    invalid_tags: List[str] = []
     for tag in tags:
-        # Always keep the claude tag
-        if tag == "claude":
+        if is_valid_tag(tag):
             valid_tags.append(tag)
-            continue
-
-        # Skip malformed tags that look like code/commands
-        if any(
-            char in tag
-            for char in ["$", '"', "'", "(", ")", ";", "|", "&", "=", "*", "!", "?"]
-        ):
+        else:
             invalid_tags.append(tag)
-            continue
 
-        # Check for spaces
-        if " " in tag:
-            invalid_tags.append(tag)
-            continue
+    return valid_tags, invalid_tags
 
-        # Check for uppercase
-        if tag != tag.lower():
-            invalid_tags.append(tag)
+
+def parse_tag_lines(text: str) -> List[str]:
+    """Parse Claude's plain-text answer listing one tag per line.
+
+    Tolerates list bullets and [[tag]] wrapping around each tag.
+
+    Args:
+        text: The raw response text
+
+    Returns:
+        List of tags in the order given
+    """
+    tags = []
+    for line in text.splitlines():
+        tag = line.strip().lstrip("-*").strip()
+        if not tag or tag.startswith("```"):
             continue
+        if tag.startswith("[[") and tag.endswith("]]"):
+            tag = tag[2:-2].strip()
+        if tag:
+            tags.append(tag)
+    return tags
 
-        # Check for special characters (allow only letters, numbers, hyphens)
-        if not re.match(r"^[a-z0-9-]+$", tag):
-            invalid_tags.append(tag)
+
+def split_tag_block(content: str) -> Tuple[str, List[str]]:
+    """Split content into its body and the trailing block of tag lines.
+
+    The tag block is the run of lines at the end of the content that are
+    either blank or consist of a single [[tag]].
+
+    Args:
+        content: The markdown content
+
+    Returns:
+        Tuple of (body_without_trailing_whitespace, tags_in_block)
+    """
+    lines = content.rstrip().split("\n")
+    tags: List[str] = []
+
+    while lines:
+        line = lines[-1].strip()
+        if not line:
+            lines.pop()
+            continue
+        if line.startswith("[[") and line.endswith("]]") and "]" not in line[2:-2]:
+            tags.append(line[2:-2])
+            lines.pop()
             continue
+        break
 
-        valid_tags.append(tag)
+    tags.reverse()
+    return "\n".join(lines).rstrip(), tags
 
-    return valid_tags, invalid_tags
 
+def parse_tag_response(text: str) -> Dict[str, List[str]]:
+    """Parse Claude's JSON answer mapping document paths to tags.
 
-def verify_content_unchanged(original_content: str, updated_content: str) -> bool:
-    """Verify that only tags were added, not conversation content changed.
+    Tolerates surrounding prose or markdown code fences around the JSON object.
 
     Args:
-        original_content: The original file content
-        updated_content: The updated file content
+        text: The raw response text
 
     Returns:
-        True if only tags were changed, False otherwise
-    """
-    # Remove all tags from both versions for comparison
-    tag_pattern = r"\[\[([^\]]+)\]\]"
-    original_no_tags = re.sub(tag_pattern, "", original_content).strip()
-    updated_no_tags = re.sub(tag_pattern, "", updated_content).strip()
+        Dict mapping each path to its list of tags
 
-    return original_no_tags == updated_no_tags
+    Raises:
+        ValueError: If no JSON object can be found in the response
+    """
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("No JSON object in Claude response")
+
+    data = json.loads(text[start : end + 1])
+    if not isinstance(data, dict):
+        raise ValueError("Claude response is not a JSON object")
+
+    return {
+        str(path): [str(tag) for tag in tags]
+        for path, tags in data.items()
+        if isinstance(tags, list)
+    }
 
 
 def format_file_size(size_bytes: int) -> str:
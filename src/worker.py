@@ -0,0 +1,126 @@
+"""Long-lived Claude sessions for Sage."""
+
+import asyncio
+from typing import Any, List, Optional, Tuple
+
+from claude_code_sdk import ClaudeCodeOptions, ClaudeSDKClient, ResultMessage
+
+_Request = Tuple[str, "asyncio.Future[List[Any]]"]
+
+
+class ClaudeWorkerPool:
+    """A fixed number of Claude sessions serving prompts from a shared queue.
+
+    Starting the Claude CLI is expensive, so each session answers several
+    prompts. The SDK requires a client to be connected, used and
+    disconnected from the same task, so every session is owned by a
+    long-lived worker task and callers only exchange prompts and results
+    with it through the queue.
+
+    Because a session keeps its conversation history, which is re-sent with
+    every prompt, a session is restarted after ``max_requests`` prompts and
+    after any error. Callers bound the size of each prompt so that
+    ``max_requests`` of them fit in the context window.
+    """
+
+    def __init__(
+        self,
+        options: ClaudeCodeOptions,
+        size: int,
+        max_requests: int = 4,
+    ):
+        """Initialize the pool.
+
+        Args:
+            options: Options used to start each Claude session
+            size: Number of worker tasks, and so of concurrent prompts
+            max_requests: Number of prompts after which a session is restarted
+        """
+        self.options = options
+        self.size = max(1, size)
+        self.max_requests = max_requests
+        self._queue: "asyncio.Queue[Optional[_Request]]" = asyncio.Queue()
+        self._workers: List["asyncio.Task[None]"] = []
+
+    async def ask(self, prompt: str) -> List[Any]:
+        """Send a prompt to the next free worker and collect the response.
+
+        Raises:
+            RuntimeError: If Claude reports an error for the prompt
+        """
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._serve()) for _ in range(self.size)
+            ]
+
+        future: "asyncio.Future[List[Any]]" = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((prompt, future))
+        return await future
+
+    async def close(self) -> None:
+        """Stop all workers once the queued prompts have been answered."""
+        workers, self._workers = self._workers, []
+        for _ in workers:
+            self._queue.put_nowait(None)
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _next_request(self) -> Optional[_Request]:
+        # Skip prompts whose caller has stopped waiting
+        while True:
+            request = await self._queue.get()
+            if request is None or not request[1].done():
+                return request
+
+    async def _serve(self) -> None:
+        request = await self._next_request()
+        while request is not None:
+            request = await self._run_session(request)
+
+    async def _run_session(self, request: _Request) -> Optional[_Request]:
+        """Answer prompts on one Claude session, starting with request.
+
+        Returns:
+            The first request for the next session, or None when closing
+        """
+        client = ClaudeSDKClient(self.options)
+        requests = 0
+        try:
+            await client.connect()
+            while True:
+                prompt, future = request
+                messages = await self._query(client, prompt)
+                if not future.done():
+                    future.set_result(messages)
+
+                requests += 1
+                if requests >= self.max_requests:
+                    break
+
+                next_request = await self._next_request()
+                if next_request is None:
+                    return None
+                request = next_request
+        except Exception as e:
+            future = request[1]
+            if not future.done():
+                future.set_exception(e)
+        finally:
+            try:
+                await client.disconnect()
+            except Exception:
+                pass
+
+        return await self._next_request()
+
+    @staticmethod
+    async def _query(client: ClaudeSDKClient, prompt: str) -> List[Any]:
+        await client.query(prompt)
+        messages = [message async for message in client.receive_response()]
+
+        result = next(
+            (m for m in reversed(messages) if isinstance(m, ResultMessage)), None
+        )
+        if result is not None and result.is_error:
+            raise RuntimeError(f"Claude returned an error: {result.result}")
+
+        return messages
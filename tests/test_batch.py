@@ -0,0 +1,101 @@
+"""Tests for request batching."""
+
+import asyncio
+
+import pytest
+from src.batch import AsyncBatchEngine
+
+
+class TestAsyncBatchEngine:
+    """Test request coalescing."""
+
+    def test_full_batch_dispatched_together(self):
+        """Test that requests filling a batch are processed in one call."""
+        calls = []
+
+        async def process(batch):
+            calls.append([key for key, _ in batch])
+            return {key: value.upper() for key, value in batch}
+
+        async def run():
+            engine = AsyncBatchEngine(process, batch_size=3, wait_timeout=10)
+            return await asyncio.gather(
+                *(engine.add_request(key, key) for key in ["a", "b", "c"])
+            )
+
+        assert asyncio.run(run()) == ["A", "B", "C"]
+        assert calls == [["a", "b", "c"]]
+
+    def test_partial_batch_dispatched_after_timeout(self):
+        """Test that a partial batch is flushed after the wait timeout."""
+        calls = []
+
+        async def process(batch):
+            calls.append([key for key, _ in batch])
+            return {key: value for key, value in batch}
+
+        async def run():
+            engine = AsyncBatchEngine(process, batch_size=8, wait_timeout=0.01)
+            return await asyncio.gather(
+                engine.add_request("a", 1), engine.add_request("b", 2)
+            )
+
+        assert asyncio.run(run()) == [1, 2]
+        assert calls == [["a", "b"]]
+
+    def test_missing_result_raises_key_error(self):
+        """Test that keys missing from the results raise KeyError."""
+
+        async def process(batch):
+            return {}
+
+        async def run():
+            engine = AsyncBatchEngine(process, batch_size=1)
+            await engine.add_request("a", 1)
+
+        with pytest.raises(KeyError):
+            asyncio.run(run())
+
+    def test_processing_error_propagates(self):
+        """Test that batch failures are raised to every request."""
+
+        async def process(batch):
+            raise RuntimeError("boom")
+
+        async def run():
+            engine = AsyncBatchEngine(process, batch_size=2)
+            return await asyncio.gather(
+                engine.add_request("a", 1),
+                engine.add_request("b", 2),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(run())
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    def test_batches_split_by_weight(self):
+        """Test that batches stay within the weight budget."""
+        calls = []
+
+        async def process(batch):
+            calls.append([key for key, _ in batch])
+            return {key: value for key, value in batch}
+
+        async def run():
+            engine = AsyncBatchEngine(
+                process,
+                batch_size=8,
+                wait_timeout=0.01,
+                max_weight=10,
+                weight_function=len,
+            )
+            return await asyncio.gather(
+                engine.add_request("a", "xxxx"),
+                engine.add_request("b", "xxxx"),
+                engine.add_request("c", "xxxx"),
+                engine.add_request("d", "x" * 20),
+                engine.add_request("e", "x"),
+            )
+
+        asyncio.run(run())
+        assert calls == [["a", "b"], ["c"], ["d"], ["e"]]
@@ -0,0 +1,144 @@
+"""Tests for the tag cache."""
+
+import asyncio
+
+from src.cache import LLMCache, SemanticCache, make_cache_key, make_prompt_hash
+
+
+class TestMakeCacheKey:
+    """Test cache key generation."""
+
+    def test_key_is_stable(self):
+        """Test that identical inputs produce identical keys."""
+        prompt_hash = make_prompt_hash("prompt", ["Read"])
+        key1 = make_cache_key(b"# Notes", prompt_hash)
+        key2 = make_cache_key(b"# Notes", make_prompt_hash("prompt", ["Read"]))
+        assert key1 == key2
+
+    def test_key_depends_on_prompt_and_tools(self):
+        """Test that prompt and tool changes invalidate the key."""
+        prompt_hash = make_prompt_hash("prompt", ["Read"])
+        base = make_cache_key(b"# Notes", prompt_hash)
+        other_prompt = make_prompt_hash("other prompt", ["Read"])
+        other_tools = make_prompt_hash("prompt", ["Read", "Edit"])
+        assert make_cache_key(b"# Notes", other_prompt) != base
+        assert make_cache_key(b"# Notes", other_tools) != base
+        assert make_cache_key(b"# Other", prompt_hash) != base
+
+
+class TestLLMCache:
+    """Test the SQLite backed cache."""
+
+    def test_roundtrip(self, tmp_path):
+        """Test that stored tags are returned on lookup."""
+        cache = LLMCache(tmp_path / "cache.sqlite")
+
+        async def run():
+            assert await cache.get("key") is None
+            await cache.set("key", ["python", "testing"])
+            return await cache.get("key")
+
+        assert asyncio.run(run()) == ["python", "testing"]
+        cache.close()
+
+    def test_expired_entry_is_miss(self, tmp_path):
+        """Test that entries older than the TTL are ignored."""
+        cache = LLMCache(tmp_path / "cache.sqlite", ttl=-1)
+
+        async def run():
+            await cache.set("key", ["python"])
+            return await cache.get("key")
+
+        assert asyncio.run(run()) is None
+        cache.close()
+
+    def test_expired_entries_pruned_on_open(self, tmp_path):
+        """Test that entries older than the TTL are deleted on connect."""
+        path = tmp_path / "cache.sqlite"
+        cache = LLMCache(path)
+        asyncio.run(cache.set("key", ["python"]))
+        cache.close()
+
+        expired = LLMCache(path, ttl=-1)
+        count = expired._connect().execute("SELECT COUNT(*) FROM cache")
+        assert count.fetchone()[0] == 0
+        expired.close()
+
+
+class TestSemanticCache:
+    """Test the similarity cache."""
+
+    def test_similar_embedding_hits(self, tmp_path):
+        """Test that a near-identical embedding reuses cached tags."""
+        cache = SemanticCache(tmp_path / "cache.sqlite", threshold=0.9)
+
+        async def run():
+            await cache.set("key", [1.0, 0.0, 0.0], "prompt", ["python"])
+            return await cache.get([0.99, 0.05, 0.0], "prompt")
+
+        assert asyncio.run(run()) == ["python"]
+        cache.close()
+
+    def test_dissimilar_embedding_misses(self, tmp_path):
+        """Test that unrelated embeddings are not reused."""
+        cache = SemanticCache(tmp_path / "cache.sqlite", threshold=0.9)
+
+        async def run():
+            await cache.set("key", [1.0, 0.0, 0.0], "prompt", ["python"])
+            return await cache.get([0.0, 1.0, 0.0], "prompt")
+
+        assert asyncio.run(run()) is None
+        cache.close()
+
+    def test_prompt_key_isolates_entries(self, tmp_path):
+        """Test that entries from another prompt are not reused."""
+        cache = SemanticCache(tmp_path / "cache.sqlite", threshold=0.9)
+
+        async def run():
+            await cache.set("key", [1.0, 0.0, 0.0], "prompt", ["python"])
+            return await cache.get([1.0, 0.0, 0.0], "other")
+
+        assert asyncio.run(run()) is None
+        cache.close()
+
+    def test_same_key_replaces_entry(self, tmp_path):
+        """Test that storing a document again replaces its entry."""
+        cache = SemanticCache(tmp_path / "cache.sqlite", threshold=0.9)
+
+        async def run():
+            await cache.set("key", [1.0, 0.0, 0.0], "prompt", ["python"])
+            await cache.set("key", [1.0, 0.0, 0.0], "prompt", ["rust"])
+            return await cache.get([1.0, 0.0, 0.0], "prompt")
+
+        assert asyncio.run(run()) == ["rust"]
+        count = cache._connect().execute("SELECT COUNT(*) FROM semantic_cache")
+        assert count.fetchone()[0] == 1
+        cache.close()
+
+    def test_expired_entries_pruned_on_open(self, tmp_path):
+        """Test that entries older than the TTL are deleted on connect."""
+        path = tmp_path / "cache.sqlite"
+        cache = SemanticCache(path, threshold=0.9)
+        asyncio.run(cache.set("key", [1.0, 0.0, 0.0], "prompt", ["python"]))
+        cache.close()
+
+        expired = SemanticCache(path, threshold=0.9, ttl=-1)
+        count = expired._connect().execute("SELECT COUNT(*) FROM semantic_cache")
+        assert count.fetchone()[0] == 0
+        expired.close()
+
+    def test_fallback_scan_is_limited(self, tmp_path, monkeypatch):
+        """Test that the brute-force scan only considers the newest entries."""
+        monkeypatch.setattr("src.cache.SEMANTIC_SCAN_LIMIT", 1)
+        cache = SemanticCache(tmp_path / "cache.sqlite", threshold=0.9, ttl=None)
+        cache._connect()
+        cache._has_vec = False
+
+        async def run():
+            await cache.set("old", [1.0, 0.0, 0.0], "prompt", ["python"])
+            cache._connect().execute("UPDATE semantic_cache SET created_at = 1")
+            await cache.set("new", [0.0, 1.0, 0.0], "prompt", ["rust"])
+            return await cache.get([1.0, 0.0, 0.0], "prompt")
+
+        assert asyncio.run(run()) is None
+        cache.close()
@@ -0,0 +1,84 @@
+"""Tests for file I/O helpers."""
+
+import asyncio
+
+from src.fileio import (
+    append_if_unchanged,
+    read_bytes,
+    read_tail,
+    replace_if_unchanged,
+)
+
+
+class TestFileIO:
+    """Test the async file helpers."""
+
+    def test_read_bytes(self, tmp_path):
+        """Test that the full content of a file is read unchanged."""
+        path = tmp_path / "note.md"
+        path.write_bytes("# Notat\n\nfeilsøking\n".encode("utf-8"))
+        assert asyncio.run(read_bytes(path)) == "# Notat\n\nfeilsøking\n".encode(
+            "utf-8"
+        )
+
+    def test_read_tail_of_small_file(self, tmp_path):
+        """Test that a file smaller than the tail size is read whole."""
+        path = tmp_path / "note.md"
+        path.write_bytes(b"# Small\n\n[[python]]")
+        assert asyncio.run(read_tail(path, 4096)) == (b"# Small\n\n[[python]]", True)
+
+    def test_read_tail_of_large_file(self, tmp_path):
+        """Test that only the end of a large file is read."""
+        path = tmp_path / "note.md"
+        path.write_bytes(b"x" * 10000 + b"\n\n[[python]]")
+        data, is_whole_file = asyncio.run(read_tail(path, 16))
+        assert data == b"xxxx\n\n[[python]]"
+        assert is_whole_file is False
+
+    def test_replace_if_unchanged_writes(self, tmp_path):
+        """Test that an unmodified file is replaced."""
+        path = tmp_path / "note.md"
+        path.write_bytes(b"# Note")
+        written = asyncio.run(
+            replace_if_unchanged(path, b"# Note", b"# Note\n\n[[python]]")
+        )
+        assert written is True
+        assert path.read_bytes() == b"# Note\n\n[[python]]"
+
+    def test_replace_if_unchanged_detects_edit(self, tmp_path):
+        """Test that a file edited since it was read is left alone."""
+        path = tmp_path / "note.md"
+        path.write_bytes(b"# Nite")
+        written = asyncio.run(replace_if_unchanged(path, b"# Note", b"# Note\n[[x]]"))
+        assert written is False
+        assert path.read_bytes() == b"# Nite"
+
+    def test_replace_if_unchanged_shorter_data(self, tmp_path):
+        """Test that replacing with shorter data truncates the file."""
+        path = tmp_path / "note.md"
+        path.write_bytes(b"# Note\n\n\n\n")
+        assert asyncio.run(replace_if_unchanged(path, b"# Note\n\n\n\n", b"# N"))
+        assert path.read_bytes() == b"# N"
+
+    def test_replace_if_unchanged_empty_file(self, tmp_path):
+        """Test that an empty file can be replaced."""
+        path = tmp_path / "note.md"
+        path.write_bytes(b"")
+        assert asyncio.run(replace_if_unchanged(path, b"", b"[[python]]"))
+        assert path.read_bytes() == b"[[python]]"
+
+    def test_append_if_unchanged_appends(self, tmp_path):
+        """Test that data is appended to an unmodified file."""
+        path = tmp_path / "note.md"
+        path.write_bytes(b"# Note\n")
+        written = asyncio.run(append_if_unchanged(path, b"# Note\n", b"\n[[python]]"))
+        assert written is True
+        assert path.read_bytes() == b"# Note\n\n[[python]]"
+
+    def test_append_if_unchanged_detects_new_ending(self, tmp_path):
+        """Test that nothing is appended when the file end was edited."""
+        path = tmp_path / "note.md"
+        path.write_bytes(b"# Note\n[[x]]")
+        written = asyncio.run(append_if_unchanged(path, b"# Note\n[[y]]", b"\n[[z]]"))
+        assert written is False
+        assert path.read_bytes() == b"# Note\n[[x]]"
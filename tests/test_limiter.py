@@ -0,0 +1,41 @@
+"""Tests for request rate limiting."""
+
+import asyncio
+import time
+
+import pytest
+from src.limiter import RateLimiter
+
+
+class TestRateLimiter:
+    """Test the token bucket limiter."""
+
+    def test_burst_is_immediate(self):
+        """Test that requests within the burst do not wait."""
+        limiter = RateLimiter(rate=1, burst=3)
+
+        async def run():
+            for _ in range(3):
+                async with limiter:
+                    pass
+
+        start = time.monotonic()
+        asyncio.run(run())
+        assert time.monotonic() - start < 0.5
+
+    def test_rate_is_enforced(self):
+        """Test that requests beyond the burst are spaced by the rate."""
+        limiter = RateLimiter(rate=50)
+
+        async def run():
+            await asyncio.gather(*(limiter.acquire() for _ in range(6)))
+
+        start = time.monotonic()
+        asyncio.run(run())
+        # One token is available immediately, the other five take 1/50 s each
+        assert time.monotonic() - start >= 0.09
+
+    def test_invalid_rate_rejected(self):
+        """Test that a non-positive rate is rejected."""
+        with pytest.raises(ValueError):
+            RateLimiter(rate=0)
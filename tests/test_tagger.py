@@ -0,0 +1,246 @@
+"""Tests for tagger helpers that do not call Claude."""
+
+import asyncio
+import json
+import re
+
+from claude_code_sdk import ResultMessage
+
+from src.tagger import AsyncMarkdownTagger
+
+
+def collect_markdown(directory, recursive):
+    """Collect the paths yielded by the directory walker."""
+    tagger = AsyncMarkdownTagger(use_cache=False)
+
+    async def run():
+        return [path async for path in tagger._iter_markdown(directory, recursive)]
+
+    return sorted(path.relative_to(directory).as_posix() for path in asyncio.run(run()))
+
+
+def claude_reply(text):
+    """Build the messages of a successful Claude answer."""
+    return ResultMessage(
+        subtype="success",
+        duration_ms=1,
+        duration_api_ms=1,
+        is_error=False,
+        num_turns=1,
+        session_id="test",
+        result=text,
+    )
+
+
+class TestIterMarkdown:
+    """Test markdown file discovery."""
+
+    def make_tree(self, root):
+        (root / "a.md").write_text("# A")
+        (root / "notes.txt").write_text("not markdown")
+        (root / "sub" / "deeper").mkdir(parents=True)
+        (root / "sub" / "b.md").write_text("# B")
+        (root / "sub" / "deeper" / "c.md").write_text("# C")
+        (root / "folder.md").mkdir()
+
+    def test_non_recursive(self, tmp_path):
+        """Test that only top-level markdown files are found."""
+        self.make_tree(tmp_path)
+        assert collect_markdown(tmp_path, recursive=False) == ["a.md"]
+
+    def test_recursive(self, tmp_path):
+        """Test that markdown files in subdirectories are found."""
+        self.make_tree(tmp_path)
+        assert collect_markdown(tmp_path, recursive=True) == [
+            "a.md",
+            "sub/b.md",
+            "sub/deeper/c.md",
+        ]
+
+
+class TestProcessFile:
+    """Test tagging a single file with a stubbed Claude call."""
+
+    def make_tagger(self, monkeypatch, failures):
+        tagger = AsyncMarkdownTagger(use_cache=False)
+        calls = []
+
+        async def fake_ask_claude(prompt):
+            calls.append(prompt)
+            if len(calls) <= failures:
+                raise RuntimeError("connection reset")
+            return [claude_reply("python")]
+
+        async def fake_sleep(delay):
+            pass
+
+        monkeypatch.setattr(tagger, "_ask_claude", fake_ask_claude)
+        monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+        return tagger, calls
+
+    def test_retry_succeeds(self, tmp_path, monkeypatch):
+        """Test that a failed attempt is retried."""
+        path = tmp_path / "note.md"
+        path.write_text("# Note")
+        tagger, calls = self.make_tagger(monkeypatch, failures=1)
+
+        assert asyncio.run(tagger.process_file(path)) == (True, None, ["python"])
+        assert len(calls) == 2
+        assert path.read_text() == "# Note\n\n[[python]]"
+
+    def test_gives_up_after_three_attempts(self, tmp_path, monkeypatch):
+        """Test that the error is reported once all attempts failed."""
+        path = tmp_path / "note.md"
+        path.write_text("# Note")
+        tagger, calls = self.make_tagger(monkeypatch, failures=3)
+
+        assert asyncio.run(tagger.process_file(path)) == (
+            False,
+            "Error after 3 attempts: connection reset",
+            [],
+        )
+        assert len(calls) == 3
+        assert path.read_text() == "# Note"
+
+    def test_rewrites_when_tags_cannot_be_appended(self, tmp_path, monkeypatch):
+        """Test that extra trailing whitespace is replaced by the tag block."""
+        path = tmp_path / "note.md"
+        path.write_text("# Note\n\n\n\n")
+        tagger, calls = self.make_tagger(monkeypatch, failures=0)
+
+        assert asyncio.run(tagger.process_file(path)) == (True, None, ["python"])
+        assert path.read_text() == "# Note\n\n[[python]]"
+
+    def test_invalid_suggestions_are_reported(self, tmp_path):
+        """Test that malformed tags are counted rather than silently dropped."""
+        path = tmp_path / "note.md"
+        path.write_text("# Note")
+        tagger = AsyncMarkdownTagger(use_cache=False)
+
+        result = asyncio.run(
+            tagger._apply_tags(
+                path,
+                path.read_bytes(),
+                "# Note",
+                ["python", "foo]bar", "python"],
+                None,
+                None,
+            )
+        )
+
+        assert result == (True, "Cleaned 1 invalid tags", ["python"])
+        assert path.read_text() == "# Note\n\n[[python]]"
+
+
+class TestProcessFilesBatched:
+    """Test batched tagging with a stubbed Claude call."""
+
+    def make_tagger(self, monkeypatch, answer):
+        tagger = AsyncMarkdownTagger(use_cache=False)
+        calls = []
+
+        async def fake_ask_claude(prompt):
+            calls.append(prompt)
+            if prompt.startswith(tagger.batch_prompt):
+                paths = re.findall(r"^<<<FILE (.*)>>>$", prompt, re.MULTILINE)
+                return [claude_reply(answer(len(calls), paths))]
+            return [claude_reply("python")]
+
+        async def fake_sleep(delay):
+            pass
+
+        monkeypatch.setattr(tagger, "_ask_claude", fake_ask_claude)
+        monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+        return tagger, calls
+
+    def make_notes(self, directory, count):
+        for i in range(count):
+            (directory / f"note{i}.md").write_text(f"# Note {i}")
+
+    def test_failed_batch_falls_back_to_single_files(self, tmp_path, monkeypatch):
+        """Test that files of a failed batch are retried one by one."""
+
+        def answer(call, paths):
+            if call == 1:
+                raise RuntimeError("transient")
+            return json.dumps({path: ["python"] for path in paths})
+
+        self.make_notes(tmp_path, 5)
+        tagger, calls = self.make_tagger(monkeypatch, answer)
+
+        assert asyncio.run(tagger.process_directory(tmp_path)) == (5, 0, [])
+        assert len(calls) == 6
+        assert (tmp_path / "note0.md").read_text() == "# Note 0\n\n[[python]]"
+
+    def test_missing_file_in_answer_falls_back(self, tmp_path, monkeypatch):
+        """Test that files missing from Claude's answer are tagged singly."""
+
+        def answer(call, paths):
+            return json.dumps({path: ["python"] for path in paths[1:]})
+
+        self.make_notes(tmp_path, 3)
+        tagger, calls = self.make_tagger(monkeypatch, answer)
+
+        assert asyncio.run(tagger.process_directory(tmp_path)) == (3, 0, [])
+        assert len(calls) == 2
+
+
+class TestSessionReuse:
+    """Test that batched runs reuse Claude sessions."""
+
+    def test_one_session_serves_several_batches(self, tmp_path, monkeypatch):
+        """Test that consecutive batches are answered by the same session."""
+        clients = []
+
+        class FakeClient:
+            def __init__(self, options):
+                self.prompts = []
+                clients.append(self)
+
+            async def connect(self):
+                pass
+
+            async def query(self, prompt):
+                self.prompts.append(prompt)
+
+            async def receive_response(self):
+                paths = re.findall(r"^<<<FILE (.*)>>>$", self.prompts[-1], re.M)
+                yield claude_reply(json.dumps({path: ["python"] for path in paths}))
+
+            async def disconnect(self):
+                pass
+
+        monkeypatch.setattr("src.worker.ClaudeSDKClient", FakeClient)
+        for i in range(4):
+            (tmp_path / f"note{i}.md").write_text(f"# Note {i}")
+        tagger = AsyncMarkdownTagger(use_cache=False, max_concurrent=1, batch_size=2)
+
+        assert asyncio.run(tagger.process_directory(tmp_path)) == (4, 0, [])
+        assert len(clients) == 1
+        assert len(clients[0].prompts) == 2
+
+
+class TestAlreadyTagged:
+    """Test detection of files that already carry tags."""
+
+    def test_wikilink_in_body_is_not_a_tag(self, tmp_path):
+        """Test that a link near the end of a long note is not a tag block."""
+        path = tmp_path / "note.md"
+        path.write_text("# Note\n\n" + "text\n" * 1000 + "See [[Other Page]].\n")
+        tagger = AsyncMarkdownTagger(use_cache=False)
+
+        raw_content, existing_tags = asyncio.run(tagger._read_untagged(path, False))
+
+        assert raw_content == path.read_bytes()
+        assert existing_tags == []
+
+    def test_trailing_tag_block_is_detected(self, tmp_path):
+        """Test that a file ending in tag lines is skipped."""
+        path = tmp_path / "note.md"
+        path.write_text("# Note\n\nSee [[Other Page]].\n\n[[claude]]\n[[python]]\n")
+        tagger = AsyncMarkdownTagger(use_cache=False)
+
+        raw_content, existing_tags = asyncio.run(tagger._read_untagged(path, False))
+
+        assert raw_content is None
+        assert existing_tags == ["python"]
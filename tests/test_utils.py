@@ -1,7 +1,20 @@
 """Tests for utility functions."""
 
 import pytest
-from src.utils import validate_tags, verify_content_unchanged, format_file_size, truncate_text
+from src.utils import extract_tags, validate_tags, format_file_size, truncate_text, parse_tag_response, parse_tag_lines, split_tag_block
+
+
+class TestExtractTags:
+    """Test tag extraction."""
+
+    def test_extracts_in_order(self):
+        """Test that all tags are found in order of appearance."""
+        text = "See [[note]] and [[other-note]].\n\n[[python]]"
+        assert extract_tags(text) == ["note", "other-note", "python"]
+
+    def test_ignores_unclosed_and_empty_brackets(self):
+        """Test that malformed brackets are not treated as tags."""
+        assert extract_tags("[[]] [[open [x] [[ok]]") == ["ok"]
 
 
 class TestValidateTags:
@@ -76,6 +89,36 @@ Content here.
         assert "Python" in invalid_tags
         assert "JAVASCRIPT" in invalid_tags
 
+    def test_duplicate_tags_reported_once(self):
+        """Test that repeated tags are deduplicated in order."""
+        content = """# Test File
+
+[[python]]
+[[Bad Tag]]
+[[testing]]
+[[python]]
+[[Bad Tag]]"""
+
+        valid_tags, invalid_tags = validate_tags(content)
+
+        assert valid_tags == ["python", "testing"]
+        assert invalid_tags == ["Bad Tag"]
+
+    def test_numeric_and_non_ascii_tags(self):
+        """Test that numeric tags pass and non-ASCII letters are rejected."""
+        content = """# Test File
+
+Content here.
+
+[[2024]]
+[[under_score]]
+[[café]]"""
+
+        valid_tags, invalid_tags = validate_tags(content)
+
+        assert valid_tags == ["2024"]
+        assert invalid_tags == ["under_score", "café"]
+
     def test_tags_in_code_blocks_ignored(self):
         """Test that tags within code blocks are ignored."""
         content = """# Test File
@@ -97,59 +140,66 @@ And some more content with [[actual-tag]] at the end.
         assert "not-a-tag" not in valid_tags
         assert "not-a-tag" not in invalid_tags
 
+    def test_only_last_twenty_lines_scanned(self):
+        """Test that tags above the last 20 lines are ignored."""
+        content = "[[early]]\n[[edge]]\n" + "text\n" * 18 + "[[python]]"
 
-class TestVerifyContentUnchanged:
-    """Test content verification functionality."""
+        valid_tags, invalid_tags = validate_tags(content)
 
-    def test_only_tags_added(self):
-        """Test that content is unchanged when only tags are added."""
-        original = """# Test File
+        assert valid_tags == ["edge", "python"]
+        assert invalid_tags == []
 
-Some content here.
-More content."""
-        
-        updated = """# Test File
 
-Some content here.
-More content.
+class TestParseTagLines:
+    """Test parsing of single-file tag responses."""
 
-[[python]]
-[[test]]"""
-        
-        assert verify_content_unchanged(original, updated) is True
+    def test_one_tag_per_line(self):
+        """Test that plain, bulleted and bracketed lines are parsed."""
+        text = "python\n- tutorial\n[[planning]]\n\n"
+        assert parse_tag_lines(text) == ["python", "tutorial", "planning"]
 
-    def test_content_modified(self):
-        """Test that content changes are detected."""
-        original = """# Test File
+    def test_code_fences_skipped(self):
+        """Test that code fence lines are not treated as tags."""
+        assert parse_tag_lines("```\npython\n```") == ["python"]
 
-Some content here.
-More content."""
-        
-        updated = """# Test File
 
-Some MODIFIED content here.
-More content.
+class TestSplitTagBlock:
+    """Test splitting content from its trailing tag block."""
 
-[[python]]"""
-        
-        assert verify_content_unchanged(original, updated) is False
+    def test_trailing_tags(self):
+        """Test that trailing tag lines are split from the body."""
+        content = "# Title\n\nSee [[other-note]] here.\n\n[[claude]]\n[[python]]\n"
+        body, tags = split_tag_block(content)
+        assert body == "# Title\n\nSee [[other-note]] here."
+        assert tags == ["claude", "python"]
 
-    def test_tags_modified_only(self):
-        """Test that only tag changes don't trigger content change detection."""
-        original = """# Test File
+    def test_no_tags(self):
+        """Test that content without a tag block is returned unchanged."""
+        body, tags = split_tag_block("# Title\n\nContent.\n")
+        assert body == "# Title\n\nContent."
+        assert tags == []
 
-Content here.
 
-[[old-tag]]"""
-        
-        updated = """# Test File
+class TestParseTagResponse:
+    """Test parsing of batched tag responses."""
 
-Content here.
+    def test_plain_json(self):
+        """Test that a bare JSON object is parsed."""
+        text = '{"notes/a.md": ["python", "tutorial"], "b.md": ["planning"]}'
+        assert parse_tag_response(text) == {
+            "notes/a.md": ["python", "tutorial"],
+            "b.md": ["planning"],
+        }
 
-[[new-tag]]
-[[another-tag]]"""
-        
-        assert verify_content_unchanged(original, updated) is True
+    def test_fenced_json(self):
+        """Test that JSON inside a code fence is parsed."""
+        text = 'Here are the tags:\n```json\n{"a.md": ["python"]}\n```'
+        assert parse_tag_response(text) == {"a.md": ["python"]}
+
+    def test_no_json_raises(self):
+        """Test that a response without JSON is rejected."""
+        with pytest.raises(ValueError):
+            parse_tag_response("I could not tag these files.")
 
 
 class TestFormatFileSize:
@@ -0,0 +1,110 @@
+"""Tests for persistent Claude workers."""
+
+import asyncio
+
+import pytest
+from claude_code_sdk import ClaudeCodeOptions, ResultMessage
+
+import src.worker as worker_module
+from src.worker import ClaudeWorkerPool
+
+
+class FakeClient:
+    """Stand-in for ClaudeSDKClient that records its lifecycle.
+
+    Like the SDK client, it must be used and disconnected from the task that
+    connected it.
+    """
+
+    instances = []
+
+    def __init__(self, options):
+        self.connected = False
+        self.prompts = []
+        self.task = None
+        FakeClient.instances.append(self)
+
+    def check_task(self):
+        if asyncio.current_task() is not self.task:
+            raise RuntimeError("client used from a different task")
+
+    async def connect(self):
+        self.task = asyncio.current_task()
+        self.connected = True
+
+    async def query(self, prompt):
+        self.check_task()
+        self.prompts.append(prompt)
+
+    async def receive_response(self):
+        self.check_task()
+        yield ResultMessage(
+            subtype="success",
+            duration_ms=1,
+            duration_api_ms=1,
+            is_error=self.prompts[-1] == "fail",
+            num_turns=1,
+            session_id="test",
+            result="python",
+        )
+
+    async def disconnect(self):
+        self.check_task()
+        self.connected = False
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    FakeClient.instances = []
+    monkeypatch.setattr(worker_module, "ClaudeSDKClient", FakeClient)
+    return FakeClient
+
+
+class TestClaudeWorkerPool:
+    """Test session reuse and restarts."""
+
+    def test_session_reused_then_restarted(self, fake_client):
+        """Test that one session serves max_requests prompts."""
+        pool = ClaudeWorkerPool(ClaudeCodeOptions(), size=1, max_requests=2)
+
+        async def run():
+            for prompt in ["a", "b", "c"]:
+                await pool.ask(prompt)
+            await pool.close()
+
+        asyncio.run(run())
+        assert [client.prompts for client in fake_client.instances] == [
+            ["a", "b"],
+            ["c"],
+        ]
+        assert not any(client.connected for client in fake_client.instances)
+
+    def test_error_restarts_session(self, fake_client):
+        """Test that an error result closes the session."""
+        pool = ClaudeWorkerPool(ClaudeCodeOptions(), size=1)
+
+        async def run():
+            with pytest.raises(RuntimeError, match="Claude returned an error"):
+                await pool.ask("fail")
+            await pool.ask("ok")
+            await pool.close()
+
+        asyncio.run(run())
+        assert len(fake_client.instances) == 2
+        assert not any(client.connected for client in fake_client.instances)
+
+    def test_clients_stay_in_their_worker_task(self, fake_client):
+        """Test that prompts from other tasks and closing from the main task
+        never touch a client outside the task that connected it."""
+        pool = ClaudeWorkerPool(ClaudeCodeOptions(), size=2, max_requests=3)
+
+        async def run():
+            tasks = [asyncio.create_task(pool.ask(f"prompt {i}")) for i in range(10)]
+            results = await asyncio.gather(*tasks)
+            await pool.close()
+            return results
+
+        results = asyncio.run(run())
+        assert len(results) == 10
+        assert sum(len(client.prompts) for client in fake_client.instances) == 10
+        assert not any(client.connected for client in fake_client.instances)